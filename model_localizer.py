@@ -7,7 +7,7 @@ import threading
 import time
 import uuid
 from concurrent.futures import ThreadPoolExecutor
-from pathlib import Path, PurePosixPath
+from pathlib import Path
 
 try:
     import yaml
@@ -169,12 +169,12 @@ def _normalize_relpath(relpath: str) -> str | None:
     relpath = relpath.strip().replace("\\", "/")
     if not relpath:
         return None
-    path = PurePosixPath(relpath)
-    if path.is_absolute():
+    if relpath.startswith("/"):
         return None
-    if any(part in ("..", "") for part in path.parts):
+    parts = [part for part in relpath.split("/") if part and part != "."]
+    if ".." in parts:
         return None
-    return str(path)
+    return "/".join(parts) if parts else "."
 
 def _strip_bracket_suffix(value: str) -> str:
     if not value:
@@ -195,7 +195,7 @@ def _candidate_relpaths(raw: str, category: str) -> list[str]:
         if trimmed:
             exact_rel = trimmed
     variants = [exact_rel]
-    name_only = PurePosixPath(exact_rel).name
+    name_only = exact_rel.rpartition("/")[2]
     if name_only and name_only != exact_rel:
         variants.append(name_only)
     return variants
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import io
 import json
@@ -10,7 +11,13 @@ import shutil
 import subprocess
 import tempfile
 import time
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from fnmatch import fnmatch
+from functools import lru_cache
+from itertools import islice, repeat
 from pathlib import Path
+from urllib.parse import quote
 
 try:
     from aiohttp import web
@@ -34,6 +41,11 @@ try:
 except Exception:  # pragma: no cover
     get_workflow_context = None
 
+try:
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None
+
 try:
     import imageio.v3 as iio
 except Exception:  # pragma: no cover
@@ -52,6 +64,11 @@ try:
 except Exception:  # pragma: no cover
     torch = None
 
+try:
+    import cv2
+except Exception:  # pragma: no cover
+    cv2 = None
+
 try:
     from PIL import Image
 except Exception:  # pragma: no cover
@@ -80,6 +97,13 @@ _VIDEO_EXTS = {
     ".mpeg",
 }
 
+_MEDIA_EXT_KINDS = {
+    **{ext: "image" for ext in _IMAGE_EXTS},
+    **{ext.upper(): "image" for ext in _IMAGE_EXTS},
+    **{ext: "video" for ext in _VIDEO_EXTS},
+    **{ext.upper(): "video" for ext in _VIDEO_EXTS},
+}
+
 _BROWSER_VIDEO_EXTS = {
     ".mp4",
     ".webm",
@@ -89,6 +113,15 @@ _BROWSER_VIDEO_EXTS = {
 _RESIZE_MODES = ["none", "context", "custom"]
 _RESIZE_STRATEGIES = ["stretch", "fit", "fill"]
 _SINGLE_EXTENSIONS = ["png", "jpg", "jpeg", "webp", "tif", "tiff", "bmp"]
+_EXTENSION_FORMATS = {
+    "png": "PNG",
+    "jpg": "JPEG",
+    "jpeg": "JPEG",
+    "webp": "WEBP",
+    "tif": "TIFF",
+    "tiff": "TIFF",
+    "bmp": "BMP",
+}
 _MP4_PRESETS = [
     "veryfast",
     "ultrafast",
@@ -102,6 +135,37 @@ _MP4_PRESETS = [
 ]
 _PRORES_PROFILES = ["hq", "proxy", "lt", "standard", "4444", "4444xq"]
 
+_SEQUENCE_TOKEN_RE = re.compile(r"%0\d+d|%d|#+")
+_SLUG_INVALID_RE = re.compile(r"[^A-Za-z0-9_-]+")
+_SLUG_CLEAN_RE = re.compile(r"[A-Za-z0-9-](?:[A-Za-z0-9_-]*[A-Za-z0-9-])?")
+
+_FFMPEG_PREVIEW_PREFIX = ("ffmpeg", "-hide_banner", "-loglevel", "error")
+_FFMPEG_PREVIEW_OUTPUT = (
+    "-c:v",
+    "libx264",
+    "-preset",
+    "veryfast",
+    "-crf",
+    "26",
+    "-pix_fmt",
+    "yuv420p",
+    "-movflags",
+    "frag_keyframe+empty_moov",
+    "-f",
+    "mp4",
+    "pipe:1",
+)
+
+_SCAN_WORKERS = 16
+_DECODE_WORKERS = os.cpu_count() or 1
+_ENCODE_WORKERS = os.cpu_count() or 1
+_UPLOAD_FLUSH_BYTES = 1024 * 1024
+_PREVIEW_CACHE_LIMIT = 16
+_PREVIEW_CACHE_MAX_BYTES = 32 * 1024 * 1024
+_PREVIEW_CACHE_TOTAL_BYTES = 96 * 1024 * 1024
+_PREVIEW_CACHE: OrderedDict[tuple, bytes] = OrderedDict()
+_PREVIEW_CACHE_SIZE = 0
+
 _ROUTES_REGISTERED = False
 _LAST_WRITE_PAYLOAD: dict | None = None
 _LAST_WRITE_AT = 0.0
@@ -109,7 +173,8 @@ _LAST_WRITE_AT = 0.0
 
 class NLRead:
     def __init__(self):
-        _register_routes()
+        if not _ROUTES_REGISTERED:
+            _register_routes()
 
     @classmethod
     def INPUT_TYPES(cls):
@@ -265,8 +330,8 @@ class NLWrite:
         preview_path = None
         saved = []
         summary = ""
-        image_list = _tensor_to_images(images)
-        if not image_list:
+        batch = _image_batch(images)
+        if batch is None or batch.shape[0] == 0:
             ui_payload = {
                 "nlwrite": {
                     "preview_url": "",
@@ -279,12 +344,14 @@ class NLWrite:
             _set_last_write_payload(ui_payload.get("nlwrite"))
             return {"ui": ui_payload, "result": ()}
 
-        width = image_list[0].size[0]
-        height = image_list[0].size[1]
+        first_image = _frame_to_image(batch[0])
+        frame_count = batch.shape[0]
+        width = first_image.size[0]
+        height = first_image.size[1]
         fps_value = _preview_fps(context, fallback=24.0)
         stats = {
             "mode": mode,
-            "frame_count": len(image_list),
+            "frame_count": frame_count,
             "fps": fps_value,
             "width": width,
             "height": height,
@@ -306,13 +373,11 @@ class NLWrite:
                     temp_dir = tempfile.TemporaryDirectory()
                     frame_dir = Path(temp_dir.name)
 
-                for index, image in enumerate(image_list, start=1):
-                    filename = f"{version_tag}_{index:04d}.png"
-                    dest = frame_dir / filename
-                    image.save(dest, format="PNG")
-                    if sequence_save_png:
-                        saved.append(str(dest))
+                frame_prefix = os.path.join(frame_dir, f"{version_tag}_")
+                frame_paths = [f"{frame_prefix}{index:04d}.png" for index in range(1, frame_count + 1)]
+                _save_images(batch, frame_paths, "PNG", compress_level=6 if sequence_save_png else 1)
                 if sequence_save_png:
+                    saved.extend(frame_paths)
                     stats["outputs"].append({"type": "png_sequence", "path": str(sequence_dir)})
 
             outputs = []
@@ -368,7 +433,7 @@ class NLWrite:
                     preview_path = preview_candidate or sequence_dir
                 else:
                     preview_path = preview_candidate
-            parts = [f"Saved {len(image_list)} frames"]
+            parts = [f"Saved {frame_count} frames"]
             if sequence_save_png:
                 parts.append(f"PNG sequence to {sequence_dir}")
             if outputs:
@@ -382,7 +447,7 @@ class NLWrite:
             target_dir = output_root
             target_dir.mkdir(parents=True, exist_ok=True)
             dest = _dedupe_path(target_dir / filename)
-            image_list[0].save(dest, format=single_format)
+            first_image.save(dest, format=single_format)
             saved.append(str(dest))
             preview_path = dest
             summary = f"Saved 1 image to {dest}"
@@ -430,10 +495,13 @@ class NLWrite:
 
 
 class _ResolvedSource:
-    def __init__(self, path: str | None, mode: str, is_pattern: bool = False):
+    def __init__(
+        self, path: str | None, mode: str, is_pattern: bool = False, is_trusted: bool = False
+    ):
         self.path = path
         self.mode = mode
         self.is_pattern = is_pattern
+        self.is_trusted = is_trusted
 
 
 def _empty_output(resolved_path: str = ""):
@@ -456,30 +524,34 @@ def _set_last_write_payload(payload: dict | None) -> None:
 
 def _resolve_source(source: str, mode: str, context: dict | None = None) -> _ResolvedSource:
     source = _normalize_source(source)
+    trusted = False
     if context:
-        source = _expand_source_with_context(source, context)
+        expanded = _expand_source_with_context(source, context)
+        trusted = expanded != source and _is_within_project(expanded, context)
+        source = expanded
     if not source:
         return _ResolvedSource(None, mode)
 
     path = Path(source)
     if mode != "auto":
         if mode == "sequence":
-            return _ResolvedSource(source, mode, _is_sequence_pattern(source) or path.is_dir())
-        return _ResolvedSource(source, mode)
+            is_pattern = _is_sequence_pattern(source) or path.is_dir()
+            return _ResolvedSource(source, mode, is_pattern, is_trusted=trusted)
+        return _ResolvedSource(source, mode, is_trusted=trusted)
 
     if path.is_dir():
-        return _ResolvedSource(source, "sequence", True)
+        return _ResolvedSource(source, "sequence", True, is_trusted=trusted)
 
     if _is_sequence_pattern(source):
-        return _ResolvedSource(source, "sequence", True)
+        return _ResolvedSource(source, "sequence", True, is_trusted=trusted)
 
     ext = path.suffix.lower()
     if ext in _VIDEO_EXTS:
-        return _ResolvedSource(source, "video")
+        return _ResolvedSource(source, "video", is_trusted=trusted)
     if ext in _IMAGE_EXTS:
-        return _ResolvedSource(source, "image")
+        return _ResolvedSource(source, "image", is_trusted=trusted)
 
-    return _ResolvedSource(source, "image")
+    return _ResolvedSource(source, "image", is_trusted=trusted)
 
 
 def _normalize_source(source: str) -> str:
@@ -501,14 +573,26 @@ def _expand_source_with_context(source: str, context: dict | None) -> str:
     return source
 
 
+def _is_within_project(resolved_source: str, context: dict | None) -> bool:
+    project_root = _project_path_from_context(context)
+    if not project_root:
+        return False
+    try:
+        root_resolved = project_root.resolve()
+    except Exception:
+        return False
+    path = Path(resolved_source)
+    return path == root_resolved or root_resolved in path.parents
+
+
 def _is_sequence_pattern(source: str) -> bool:
     name = Path(source).name
-    return bool(re.search(r"%0\d+d|%d|#+", name))
+    return _SEQUENCE_TOKEN_RE.search(name) is not None
 
 
+@lru_cache(maxsize=256)
 def _pattern_components(name: str) -> tuple[str, re.Pattern | None]:
-    token_re = re.compile(r"%0\d+d|%d|#+")
-    tokens = list(token_re.finditer(name))
+    tokens = list(_SEQUENCE_TOKEN_RE.finditer(name))
     if not tokens:
         return name, None
     regex_parts = []
@@ -527,76 +611,64 @@ def _pattern_components(name: str) -> tuple[str, re.Pattern | None]:
         last = match.end()
     regex_parts.append(re.escape(name[last:]))
     regex = re.compile(r"^" + "".join(regex_parts) + r"$")
-    glob_name = token_re.sub("*", name)
+    glob_name = _SEQUENCE_TOKEN_RE.sub("*", name)
     return glob_name, regex
 
 
-def _iter_sequence_files(source: str):
+def _list_sequence_files(source: str) -> list[Path]:
     path = Path(source)
     if path.is_dir():
-        for candidate in sorted(path.iterdir(), key=lambda p: p.name):
-            if candidate.is_file() and candidate.suffix.lower() in _IMAGE_EXTS:
-                yield candidate
-        return
+        names = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if os.path.splitext(entry.name)[1].lower() in _IMAGE_EXTS and entry.is_file():
+                    names.append(entry.name)
+        names.sort()
+        return [path / name for name in names]
 
     glob_name, regex = _pattern_components(path.name)
     parent = path.parent
-    if not parent.exists():
-        return
+    try:
+        scanner = os.scandir(parent)
+    except OSError:
+        return []
 
     matched = []
-    for candidate in parent.glob(glob_name):
-        if not candidate.is_file():
-            continue
-        if regex is None:
-            matched.append((None, candidate))
-            continue
-        match = regex.match(candidate.name)
-        if not match:
-            continue
-        frame_token = match.group(1) if match.groups() else None
-        frame_index = int(frame_token) if frame_token else None
-        matched.append((frame_index, candidate))
+    with scanner as entries:
+        for entry in entries:
+            name = entry.name
+            frame_index = None
+            if regex is not None:
+                match = regex.match(name)
+                if not match:
+                    continue
+                frame_token = match.group(1) if match.groups() else None
+                frame_index = int(frame_token) if frame_token else None
+            elif not fnmatch(name, glob_name):
+                continue
+            if not entry.is_file():
+                continue
+            matched.append((frame_index, name))
 
     if not matched:
-        return
+        return []
 
     if any(frame is not None for frame, _ in matched):
-        matched.sort(key=lambda item: (item[0] is None, item[0] or 0, item[1].name))
+        matched.sort(key=lambda item: (item[0] is None, item[0] or 0, item[1]))
     else:
-        matched.sort(key=lambda item: item[1].name)
+        matched.sort(key=lambda item: item[1])
 
-    for _, candidate in matched:
-        yield candidate
+    return [parent / name for _, name in matched]
 
 
 def _sequence_first_and_count(source: str) -> tuple[Path | None, int]:
-    first_frame = None
-    count = 0
-    for path in _iter_sequence_files(source):
-        if first_frame is None:
-            first_frame = path
-        count += 1
-    return first_frame, count
+    files = _list_sequence_files(source)
+    return (files[0] if files else None), len(files)
 
 
 def _select_sequence_frames(resolved: _ResolvedSource, skip_first: int, every_nth: int, max_frames: int):
-    frames = []
-    count = 0
-    index = 0
-    for path in _iter_sequence_files(resolved.path or ""):
-        if index < skip_first:
-            index += 1
-            continue
-        if (index - skip_first) % every_nth != 0:
-            index += 1
-            continue
-        frames.append(path)
-        count += 1
-        if count >= max_frames:
-            break
-        index += 1
-    return frames
+    files = _list_sequence_files(resolved.path or "")
+    return files[max(0, skip_first) :: max(1, every_nth)][: max(1, max_frames)]
 
 
 def _selected_frame_count(
@@ -616,16 +688,9 @@ def _selected_frame_count(
 
 
 def _first_selected_frame(source: str, skip_first: int, every_nth: int) -> Path | None:
-    index = 0
-    for path in _iter_sequence_files(source):
-        if index < skip_first:
-            index += 1
-            continue
-        if (index - skip_first) % max(1, every_nth) != 0:
-            index += 1
-            continue
-        return path
-    return None
+    files = _list_sequence_files(source)
+    skip_first = max(0, skip_first)
+    return files[skip_first] if skip_first < len(files) else None
 
 
 def _load_image_tensor(
@@ -635,7 +700,7 @@ def _load_image_tensor(
     if image is None:
         return _empty_output(str(path))[:2]
     if target_size:
-        image = _resize_image(image, target_size, resize_mode)
+        image = _resize_image(_to_8bit_image(image), target_size, resize_mode)
     rgb, alpha = _image_to_arrays(image)
     return _arrays_to_tensor([rgb], [alpha])
 
@@ -643,23 +708,74 @@ def _load_image_tensor(
 def _load_images_tensor(
     paths: list[Path], target_size: tuple[int, int] | None, resize_mode: str
 ):
+    if not paths:
+        return _arrays_to_tensor([], [])
+    first = _open_image(paths[0])
+    target = target_size or (first.size if first is not None else None)
+    decoded = [_prepare_frame(first, target, resize_mode)]
+    decoded.extend(_map_frames(_decode_frame, paths[1:], target, resize_mode))
+    return _frames_to_tensor(decoded)
+
+
+def _map_frames(func, sources: list, target: tuple[int, int] | None, resize_mode: str) -> list:
+    if len(sources) > 1 and _DECODE_WORKERS > 1:
+        with ThreadPoolExecutor(max_workers=min(_DECODE_WORKERS, len(sources))) as executor:
+            return list(executor.map(func, sources, repeat(target), repeat(resize_mode)))
+    return [func(source, target, resize_mode) for source in sources]
+
+
+def _map_frames_bounded(func, sources, target: tuple[int, int] | None, resize_mode: str) -> list:
+    if _DECODE_WORKERS <= 1:
+        return [func(source, target, resize_mode) for source in sources]
+    results = []
+    pending = deque()
+    in_flight = 2 * _DECODE_WORKERS
+    with ThreadPoolExecutor(max_workers=_DECODE_WORKERS) as executor:
+        for source in sources:
+            if len(pending) >= in_flight:
+                results.append(pending.popleft().result())
+            pending.append(executor.submit(func, source, target, resize_mode))
+        while pending:
+            results.append(pending.popleft().result())
+    return results
+
+
+def _frames_to_tensor(frames: list):
     images = []
     masks = []
-    target = None
-    for idx, path in enumerate(paths):
-        image = _open_image(path)
-        if image is None:
+    for frame in frames:
+        if frame is None:
             continue
-        if idx == 0:
-            target = target_size or image.size
-        if target and image.size != target:
-            image = _resize_image(image, target, resize_mode)
-        rgb, alpha = _image_to_arrays(image)
+        rgb, alpha = frame
         images.append(rgb)
         masks.append(alpha)
     return _arrays_to_tensor(images, masks)
 
 
+def _decode_frame(path: Path, target: tuple[int, int] | None, resize_mode: str):
+    return _prepare_frame(_open_image(path), target, resize_mode)
+
+
+def _convert_video_frame(frame, target: tuple[int, int] | None, resize_mode: str):
+    return _prepare_frame(Image.fromarray(frame), target, resize_mode)
+
+
+def _prepare_frame(image, target: tuple[int, int] | None, resize_mode: str):
+    if image is None:
+        return None
+    if target and image.size != target:
+        image = _resize_image(_to_8bit_image(image), target, resize_mode)
+    return _image_to_arrays(image)
+
+
+def _to_8bit_image(image: Image.Image) -> Image.Image:
+    if image.mode in ("RGB", "RGBA", "L", "LA"):
+        return image
+    if "transparency" in image.info:
+        return image.convert("RGBA")
+    return image.convert("RGB")
+
+
 def _open_image(path: Path):
     if Image is None:
         return None
@@ -673,14 +789,15 @@ def _open_image(path: Path):
 
 def _image_to_arrays(image: Image.Image):
     if image.mode in ("RGBA", "LA") or "transparency" in image.info:
-        image = image.convert("RGBA")
-        data = np.asarray(image).astype(np.float32) / 255.0
+        if image.mode != "RGBA":
+            image = image.convert("RGBA")
+        data = np.asarray(image)
         rgb = data[..., :3]
         alpha = data[..., 3]
     else:
-        image = image.convert("RGB")
-        data = np.asarray(image).astype(np.float32) / 255.0
-        rgb = data
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        rgb = np.asarray(image)
         alpha = None
     return rgb, alpha
 
@@ -688,22 +805,18 @@ def _image_to_arrays(image: Image.Image):
 def _arrays_to_tensor(images: list[np.ndarray], masks: list[np.ndarray | None]):
     if not images:
         return _empty_output()[:2]
-    images_np = np.stack(images, axis=0)
-    image_tensor = torch.from_numpy(images_np)
-
-    if any(mask is not None for mask in masks):
-        mask_arrays = []
-        for idx, mask in enumerate(masks):
-            if mask is None:
-                mask_arrays.append(np.zeros(images[idx].shape[:2], dtype=np.float32))
-            else:
-                mask_arrays.append(mask.astype(np.float32))
-        mask_np = np.stack(mask_arrays, axis=0)
-    else:
-        mask_np = np.zeros((len(images), images[0].shape[0], images[0].shape[1]), dtype=np.float32)
+    count = len(images)
+    height, width, channels = images[0].shape
+    scale = np.float32(255.0)
+    images_np = np.empty((count, height, width, channels), dtype=np.float32)
+    for idx, rgb in enumerate(images):
+        np.divide(rgb, scale, out=images_np[idx], dtype=np.float32)
 
-    mask_tensor = torch.from_numpy(mask_np)
-    return image_tensor, mask_tensor
+    mask_np = np.zeros((count, height, width), dtype=np.float32)
+    for idx, mask in enumerate(masks):
+        if mask is not None:
+            np.divide(mask, scale, out=mask_np[idx], dtype=np.float32)
+    return torch.from_numpy(images_np), torch.from_numpy(mask_np)
 
 
 def _resolve_resize_target(
@@ -791,28 +904,45 @@ def _load_video_tensor(
     if iio is None:
         raise RuntimeError("imageio is required to read video files")
 
-    images = []
-    masks = []
-    target = None
-    count = 0
+    frames = _iter_selected_video_frames(path, skip_first, every_nth)
+    try:
+        selected = islice(frames, max_frames)
+        first_frame = next(selected, None)
+        if first_frame is None:
+            return _arrays_to_tensor([], [])
+
+        first = Image.fromarray(first_frame)
+        target = target_size or first.size
+        decoded = [_prepare_frame(first, target, resize_mode)]
+        del first, first_frame
+        decoded.extend(_map_frames_bounded(_convert_video_frame, selected, target, resize_mode))
+    finally:
+        frames.close()
+    return _frames_to_tensor(decoded)
+
+
+def _iter_selected_video_frames(path: Path, skip_first: int, every_nth: int):
+    reader = None
+    if hasattr(iio, "imopen"):
+        try:
+            reader = iio.imopen(str(path), "r", plugin="pyav")
+        except Exception:
+            reader = None
+    if reader is not None:
+        with reader:
+            if skip_first > 0 or every_nth > 1:
+                select_expr = f"gte(n\\,{skip_first})*not(mod(n-{skip_first}\\,{every_nth}))"
+                yield from reader.iter(filter_sequence=[("select", select_expr)])
+            else:
+                yield from reader.iter()
+        return
+
     for idx, frame in _iter_video_frames(path):
         if idx < skip_first:
             continue
         if (idx - skip_first) % every_nth != 0:
             continue
-        pil_frame = Image.fromarray(frame)
-        if target is None:
-            target = target_size or pil_frame.size
-        if target and pil_frame.size != target:
-            pil_frame = _resize_image(pil_frame, target, resize_mode)
-        rgb, alpha = _image_to_arrays(pil_frame)
-        images.append(rgb)
-        masks.append(alpha)
-        count += 1
-        if count >= max_frames:
-            break
-
-    return _arrays_to_tensor(images, masks)
+        yield frame
 
 
 def _iter_video_frames(path: Path):
@@ -839,7 +969,7 @@ def _build_change_signature(resolved: _ResolvedSource) -> str:
     if resolved.mode == "sequence":
         sample_paths = []
         if path.is_dir() or resolved.is_pattern:
-            files = list(_iter_sequence_files(resolved.path))
+            files = _list_sequence_files(resolved.path)
             if files:
                 sample_paths.append(files[0])
                 if len(files) > 1:
@@ -906,10 +1036,32 @@ def _allowed_roots(context: dict | None = None) -> list[Path]:
 
 
 def _is_safe_path(path: Path, context: dict | None = None) -> bool:
-    allow_any = os.environ.get("NL_READ_ALLOW_ANY", "").strip().lower() in {"1", "true", "yes"}
-    if allow_any:
+    if _allow_any_path():
         return True
-    resolved = path.resolve()
+    return _is_safe_resolved(path.resolve(), context)
+
+
+def _check_existing_path(
+    path: Path, context: dict | None = None, trusted: bool = False
+) -> tuple[bool, bool]:
+    if trusted:
+        return True, path.exists()
+    try:
+        resolved = path.resolve(strict=True)
+        exists = True
+    except (OSError, RuntimeError):
+        resolved = path.resolve()
+        exists = False
+    if _allow_any_path():
+        return True, exists
+    return _is_safe_resolved(resolved, context), exists
+
+
+def _allow_any_path() -> bool:
+    return os.environ.get("NL_READ_ALLOW_ANY", "").strip().lower() in {"1", "true", "yes"}
+
+
+def _is_safe_resolved(resolved: Path, context: dict | None = None) -> bool:
     for root in _allowed_roots(context):
         try:
             root_resolved = root.resolve()
@@ -942,7 +1094,9 @@ def _dedupe_path(path: Path) -> Path:
 def _safe_slug(value: str | None) -> str:
     if not value:
         return ""
-    cleaned = re.sub(r"[^A-Za-z0-9_-]+", "_", str(value).strip())
+    if isinstance(value, str) and _SLUG_CLEAN_RE.fullmatch(value):
+        return value
+    cleaned = _SLUG_INVALID_RE.sub("_", str(value).strip())
     cleaned = cleaned.strip("_")
     return cleaned
 
@@ -982,16 +1136,7 @@ def _normalize_single_extension(value: str | None) -> str:
 
 
 def _format_for_extension(extension: str) -> str:
-    mapping = {
-        "png": "PNG",
-        "jpg": "JPEG",
-        "jpeg": "JPEG",
-        "webp": "WEBP",
-        "tif": "TIFF",
-        "tiff": "TIFF",
-        "bmp": "BMP",
-    }
-    return mapping.get(extension, "PNG")
+    return _EXTENSION_FORMATS.get(extension, "PNG")
 
 
 def _prores_profile(profile: str | None) -> int:
@@ -1073,43 +1218,85 @@ def _encode_sequence_video(
 
 
 def _next_version(output_root: Path, base_prefix: str) -> int:
-    version_re = re.compile(rf"^{re.escape(base_prefix)}_v(\\d{{3,}})", re.IGNORECASE)
+    version_re = re.compile(rf"^{re.escape(base_prefix)}_v(\d{{3,}})", re.IGNORECASE)
+    marker = f"{base_prefix}_v".lower()
     max_version = 0
-    if output_root.exists():
-        for entry in output_root.iterdir():
-            match = version_re.match(entry.name)
-            if not match:
-                continue
-            try:
-                value = int(match.group(1))
-            except ValueError:
-                continue
-            max_version = max(max_version, value)
+    try:
+        names = os.listdir(output_root)
+    except OSError:
+        names = []
+    for name in names:
+        if name[: len(marker)].lower() != marker:
+            continue
+        match = version_re.match(name)
+        if not match:
+            continue
+        try:
+            value = int(match.group(1))
+        except ValueError:
+            continue
+        max_version = max(max_version, value)
     return max_version + 1
 
 
-def _tensor_to_images(images) -> list[Image.Image]:
+def _image_batch(images):
     if images is None:
-        return []
+        return None
     if not isinstance(images, torch.Tensor):
-        return []
+        return None
     if images.dim() == 3:
         images = images.unsqueeze(0)
-    images = images.detach().cpu().numpy()
-    images = np.clip(images * 255.0, 0, 255).astype(np.uint8)
-    output = []
-    for image in images:
-        if image.ndim == 2:
-            output.append(Image.fromarray(image, mode="L"))
-            continue
-        if image.shape[-1] == 1:
-            output.append(Image.fromarray(image[..., 0], mode="L"))
-            continue
-        if image.shape[-1] == 4:
-            output.append(Image.fromarray(image, mode="RGBA"))
-            continue
-        output.append(Image.fromarray(image[..., :3], mode="RGB"))
-    return output
+    return images.detach()
+
+
+def _frame_to_array(frame):
+    return (frame * 255.0).clamp_(0, 255).to(torch.uint8).cpu().numpy()
+
+
+def _frame_to_image(frame) -> Image.Image:
+    image = _frame_to_array(frame)
+    if image.ndim == 2:
+        return Image.fromarray(image, mode="L")
+    if image.shape[-1] == 1:
+        return Image.fromarray(image[..., 0], mode="L")
+    if image.shape[-1] == 4:
+        return Image.fromarray(image, mode="RGBA")
+    return Image.fromarray(image[..., :3], mode="RGB")
+
+
+def _write_png_cv2(frame, dest: str, compress_level: int) -> bool:
+    try:
+        image = _frame_to_array(frame)
+        if image.ndim == 3:
+            if image.shape[-1] == 1:
+                image = image[..., 0]
+            elif image.shape[-1] == 4:
+                image = cv2.cvtColor(image, cv2.COLOR_RGBA2BGRA)
+            else:
+                image = cv2.cvtColor(np.ascontiguousarray(image[..., :3]), cv2.COLOR_RGB2BGR)
+        ok, encoded = cv2.imencode(".png", image, [cv2.IMWRITE_PNG_COMPRESSION, compress_level])
+        if not ok:
+            return False
+        encoded.tofile(dest)
+        return True
+    except Exception:
+        return False
+
+
+def _save_images(frames, paths: list[str], image_format: str, compress_level: int = 6) -> None:
+    use_cv2 = cv2 is not None and image_format == "PNG"
+
+    def _save(frame, dest):
+        if use_cv2 and _write_png_cv2(frame, dest, compress_level):
+            return
+        _frame_to_image(frame).save(dest, format=image_format, compress_level=compress_level)
+
+    if len(paths) > 1 and _ENCODE_WORKERS > 1:
+        with ThreadPoolExecutor(max_workers=min(_ENCODE_WORKERS, len(paths))) as executor:
+            list(executor.map(_save, frames, paths))
+        return
+    for frame, dest in zip(frames, paths):
+        _save(frame, dest)
 
 
 def _build_write_preview(path: Path | None, mode: str) -> tuple[str, str]:
@@ -1501,7 +1688,7 @@ def _view_url_for_path(path: Path) -> str | None:
 
 
 def _quote(value: str) -> str:
-    return re.sub(r"[^A-Za-z0-9_.~-]", lambda m: "%{:02X}".format(ord(m.group(0))), value)
+    return quote(value, safe="")
 
 
 def _safe_int(value: str | None, default: int) -> int:
@@ -1527,14 +1714,80 @@ def _preview_fps(context: dict | None, fallback: float = 25.0) -> float:
     return fps if fps > 0 else fallback
 
 
-def _build_ffconcat(sequence_paths: list[Path], fps: float) -> str:
+def _build_ffconcat(sequence_paths: list[Path], fps: float) -> bytes:
     duration = 1.0 / fps if fps > 0 else 1.0 / 25.0
-    lines = ["ffconcat version 1.0"]
+    duration_line = b"'\nduration %.6f\n" % duration
+    buffer = bytearray(b"ffconcat version 1.0\n")
     for path in sequence_paths:
-        lines.append(f"file '{path.as_posix()}'")
-        lines.append(f"duration {duration:.6f}")
-    lines.append(f"file '{sequence_paths[-1].as_posix()}'")
-    return "\n".join(lines) + "\n"
+        buffer += b"file '"
+        buffer += os.fsencode(path.as_posix())
+        buffer += duration_line
+    buffer += b"file '"
+    buffer += os.fsencode(sequence_paths[-1].as_posix())
+    buffer += b"'\n"
+    return bytes(buffer)
+
+
+def _write_ffconcat(concat_bytes: bytes, temp_dir: Path) -> Path:
+    fd, name = tempfile.mkstemp(suffix=".ffconcat", dir=temp_dir)
+    try:
+        view = memoryview(concat_bytes)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+    finally:
+        os.close(fd)
+    return Path(name)
+
+
+def _preview_cache_key(
+    source: str,
+    frames: list[Path],
+    fps: float,
+    every_nth: int,
+    resize_to: tuple[int, int] | None,
+    resize_mode: str,
+) -> tuple | None:
+    try:
+        first_mtime = frames[0].stat().st_mtime_ns
+        last_mtime = frames[-1].stat().st_mtime_ns
+    except OSError:
+        return None
+    return (
+        source,
+        str(frames[0]),
+        str(frames[-1]),
+        len(frames),
+        first_mtime,
+        last_mtime,
+        fps,
+        max(1, int(every_nth)),
+        resize_to,
+        resize_mode,
+    )
+
+
+def _preview_cache_get(key: tuple | None) -> bytes | None:
+    if key is None:
+        return None
+    data = _PREVIEW_CACHE.get(key)
+    if data is not None:
+        _PREVIEW_CACHE.move_to_end(key)
+    return data
+
+
+def _preview_cache_put(key: tuple | None, data: bytes) -> None:
+    global _PREVIEW_CACHE_SIZE
+    if key is None or len(data) > _PREVIEW_CACHE_MAX_BYTES:
+        return
+    previous = _PREVIEW_CACHE.pop(key, None)
+    if previous is not None:
+        _PREVIEW_CACHE_SIZE -= len(previous)
+    _PREVIEW_CACHE[key] = data
+    _PREVIEW_CACHE_SIZE += len(data)
+    while len(_PREVIEW_CACHE) > _PREVIEW_CACHE_LIMIT or _PREVIEW_CACHE_SIZE > _PREVIEW_CACHE_TOTAL_BYTES:
+        _, evicted = _PREVIEW_CACHE.popitem(last=False)
+        _PREVIEW_CACHE_SIZE -= len(evicted)
 
 
 def _iter_sequence_sample(
@@ -1544,83 +1797,157 @@ def _iter_sequence_sample(
     every_nth: int = 1,
     max_frames: int = 0,
 ) -> list[Path]:
-    frames = []
-    index = 0
     limit = max(1, int(limit))
     max_frames = max(0, int(max_frames))
     effective_limit = min(limit, max_frames) if max_frames else limit
-    for path in _iter_sequence_files(source):
-        if index < skip_first:
-            index += 1
-            continue
-        if (index - skip_first) % max(1, every_nth) != 0:
-            index += 1
-            continue
-        frames.append(path)
-        if len(frames) >= effective_limit:
-            break
-        index += 1
-    return frames
+    skip_first = max(0, int(skip_first))
+    step = max(1, int(every_nth))
+    files = _list_sequence_files(source)
+    stop = min(len(files), skip_first + effective_limit * step)
+    return files[skip_first:stop:step]
 
 
-def _collect_media_entries(root: Path, collapse: bool, filter_kind: str) -> list[dict]:
+def _scan_media_dir(dirpath: str) -> tuple[list[str], list[str]]:
+    filenames = []
+    subdirs = []
+    try:
+        with os.scandir(dirpath) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.is_file():
+                    filenames.append(entry.name)
+    except OSError:
+        pass
+    return filenames, subdirs
+
+
+def _walk_media_dirs(root: str, workers: int = 1):
+    if workers <= 1:
+        stack = [root]
+        while stack:
+            dirpath = stack.pop()
+            filenames, subdirs = _scan_media_dir(dirpath)
+            stack.extend(subdirs)
+            yield dirpath, filenames
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {executor.submit(_scan_media_dir, root): root}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                dirpath = pending.pop(future)
+                filenames, subdirs = future.result()
+                for subdir in subdirs:
+                    pending[executor.submit(_scan_media_dir, subdir)] = subdir
+                yield dirpath, filenames
+
+
+def _collect_media_entries(
+    root: Path, collapse: bool, filter_kind: str, parallel: bool = False
+) -> list[dict]:
     items: list[dict] = []
     if not root.exists():
         return items
 
-    sequences = {}
-    sequence_files = set()
-    if collapse:
-        for dirpath, _dirnames, filenames in os.walk(root):
+    workers = _SCAN_WORKERS if parallel else 1
+    root_str = str(root)
+    root_prefix = os.path.join(root_str, "")
+    for dirpath, filenames in _walk_media_dirs(root_str, workers):
+        rel_dir = dirpath[len(root_prefix) :].replace(os.sep, "/") if dirpath != root_str else ""
+        display_prefix = rel_dir + "/" if rel_dir else ""
+        path_prefix = os.path.join(dirpath, "")
+        sequence_files: set[str] = set()
+        if collapse:
+            sequences = {}
             for filename in filenames:
-                ext = Path(filename).suffix.lower()
-                if ext not in _IMAGE_EXTS:
+                if _media_ext_kind(filename) != "image":
                     continue
-                match = re.match(r"^(.*?)(\d+)(\.[^.]+)$", filename)
-                if not match:
+                parts = _split_frame_name(filename)
+                if parts is None:
                     continue
-                prefix, digits, suffix = match.groups()
+                prefix, digits, suffix = parts
                 width = len(digits)
-                key = (dirpath, prefix, suffix, width)
+                key = (prefix, suffix, width)
                 sequences.setdefault(key, []).append(filename)
 
-        for (dirpath, prefix, suffix, width), names in sequences.items():
-            if len(names) < 2:
-                continue
-            pattern_name = f"{prefix}%0{width}d{suffix}"
-            rel_path = Path(dirpath).relative_to(root) / pattern_name
-            abs_path = Path(dirpath) / pattern_name
-            if filter_kind in {"all", "sequences"}:
-                items.append(
-                    {"display": rel_path.as_posix(), "path": str(abs_path), "kind": "sequence"}
-                )
-            for name in names:
-                sequence_files.add(Path(dirpath) / name)
+            for (prefix, suffix, width), names in sequences.items():
+                if len(names) < 2:
+                    continue
+                pattern_name = f"{prefix}%0{width}d{suffix}"
+                if filter_kind in {"all", "sequences"}:
+                    items.append(
+                        {
+                            "display": display_prefix + pattern_name,
+                            "path": path_prefix + pattern_name,
+                            "kind": "sequence",
+                        }
+                    )
+                sequence_files.update(names)
 
-    for dirpath, _dirnames, filenames in os.walk(root):
         for filename in filenames:
-            path = Path(dirpath) / filename
-            ext = path.suffix.lower()
-            if ext in _VIDEO_EXTS:
+            kind = _media_ext_kind(filename)
+            if kind == "video":
                 if filter_kind in {"all", "videos"}:
-                    rel_path = path.relative_to(root)
-                    items.append({"display": rel_path.as_posix(), "path": str(path), "kind": "video"})
+                    items.append(
+                        {"display": display_prefix + filename, "path": path_prefix + filename, "kind": "video"}
+                    )
                 continue
 
-            if ext not in _IMAGE_EXTS:
+            if kind != "image":
                 continue
 
-            if collapse and path in sequence_files:
+            if filename in sequence_files:
                 continue
 
             if filter_kind in {"all", "images"}:
-                rel_path = path.relative_to(root)
-                items.append({"display": rel_path.as_posix(), "path": str(path), "kind": "image"})
+                items.append(
+                    {"display": display_prefix + filename, "path": path_prefix + filename, "kind": "image"}
+                )
 
-    items.sort(key=lambda item: item["display"].lower())
+    items.sort(key=_media_sort_key)
     return items
 
 
+def _split_frame_name(filename: str) -> tuple[str, str, str] | None:
+    stem, dot, ext = filename.rpartition(".")
+    if not dot or not ext:
+        return None
+    end = len(stem)
+    start = end
+    while start and stem[start - 1].isdecimal():
+        start -= 1
+    if start == end:
+        return None
+    return stem[:start], stem[start:], dot + ext
+
+
+def _media_ext_kind(filename: str) -> str | None:
+    dot = filename.rfind(".")
+    if dot <= 0:
+        return None
+    ext = filename[dot:]
+    kind = _MEDIA_EXT_KINDS.get(ext)
+    if kind is None and not ext.islower():
+        kind = _MEDIA_EXT_KINDS.get(ext.lower())
+    return kind
+
+
+def _media_sort_key(item: dict) -> tuple[str, str]:
+    display = item["display"]
+    return display.lower(), display
+
+
+def _json_response(payload, status: int = 200):
+    if orjson is not None:
+        try:
+            return web.Response(body=orjson.dumps(payload), status=status, content_type="application/json")
+        except TypeError:
+            pass
+    return web.json_response(payload, status=status)
+
+
 def _register_routes():
     global _ROUTES_REGISTERED
     if _ROUTES_REGISTERED:
@@ -1656,7 +1983,7 @@ def _register_routes():
             resize_width,
             resize_height,
         )
-        return web.json_response(payload)
+        return _json_response(payload)
 
     @routes.get("/nl_read/list")
     async def nl_read_list(request):
@@ -1665,7 +1992,7 @@ def _register_routes():
         filter_kind = request.rel_url.query.get("filter", "all")
 
         if folder_paths is None:
-            return web.json_response({"items": []})
+            return _json_response({"items": []})
 
         context = _get_workflow_context()
         project_root = _project_path_from_context(context)
@@ -1680,15 +2007,17 @@ def _register_routes():
             }
             root = roots.get(root_key)
         if root is None:
-            return web.json_response({"items": [], "has_context": bool(_project_input_from_context(context))})
+            return _json_response({"items": [], "has_context": bool(_project_input_from_context(context))})
 
-        items = _collect_media_entries(root, collapse, filter_kind)
+        loop = asyncio.get_running_loop()
+        items = await loop.run_in_executor(
+            None, _collect_media_entries, root, collapse, filter_kind, bool(use_project_root)
+        )
         if use_project_root:
+            prefix = root_key + "/"
             for item in items:
-                rel = Path(item["display"])
-                item["display"] = str(Path(root_key) / rel)
-                item["path"] = str(Path(root_key) / rel)
-        return web.json_response(
+                item["display"] = item["path"] = prefix + item["display"]
+        return _json_response(
             {
                 "items": items,
                 "root": str(root),
@@ -1699,7 +2028,7 @@ def _register_routes():
     @routes.get("/nl_write/last")
     async def nl_write_last(request):
         payload = _LAST_WRITE_PAYLOAD if isinstance(_LAST_WRITE_PAYLOAD, dict) else None
-        return web.json_response(
+        return _json_response(
             {"ok": bool(payload), "payload": payload or {}, "at": _LAST_WRITE_AT}
         )
 
@@ -1725,9 +2054,10 @@ def _register_routes():
 
         path = Path(resolved.path)
         if resolved.mode == "sequence":
-            first_frame = next(_iter_sequence_files(resolved.path), None)
-            if not first_frame:
+            files = _list_sequence_files(resolved.path)
+            if not files:
                 raise web.HTTPNotFound()
+            first_frame = files[0]
             if not _is_safe_path(first_frame, context):
                 raise web.HTTPForbidden()
             if anim and _ffmpeg_available():
@@ -1740,7 +2070,14 @@ def _register_routes():
                 )
                 if not frames:
                     raise web.HTTPNotFound()
-                concat_text = _build_ffconcat(frames, fps=_preview_fps(context))
+                fps_value = _preview_fps(context)
+                cache_key = _preview_cache_key(
+                    resolved.path, frames, fps_value, every_nth, resize_to, resize_mode
+                )
+                cached = _preview_cache_get(cache_key)
+                if cached is not None:
+                    return web.Response(body=cached, content_type="video/mp4")
+                concat_bytes = _build_ffconcat(frames, fps=fps_value)
                 temp_root = None
                 if folder_paths is not None:
                     try:
@@ -1749,20 +2086,13 @@ def _register_routes():
                         temp_root = None
                 temp_dir = temp_root or Path(tempfile.gettempdir())
                 temp_dir.mkdir(parents=True, exist_ok=True)
-                with tempfile.NamedTemporaryFile(
-                    mode="w", suffix=".ffconcat", dir=temp_dir, delete=False
-                ) as handle:
-                    handle.write(concat_text)
-                    concat_path = Path(handle.name)
+                concat_path = _write_ffconcat(concat_bytes, temp_dir)
 
                 vf_parts = []
                 if resize_to:
                     vf_parts.append(_ffmpeg_resize_filter(resize_to, resize_mode))
                 cmd = [
-                    "ffmpeg",
-                    "-hide_banner",
-                    "-loglevel",
-                    "error",
+                    *_FFMPEG_PREVIEW_PREFIX,
                     "-f",
                     "concat",
                     "-safe",
@@ -1770,29 +2100,24 @@ def _register_routes():
                     "-i",
                     str(concat_path),
                     *(["-vf", ",".join(vf_parts)] if vf_parts else []),
-                    "-c:v",
-                    "libx264",
-                    "-preset",
-                    "veryfast",
-                    "-crf",
-                    "26",
-                    "-pix_fmt",
-                    "yuv420p",
-                    "-movflags",
-                    "frag_keyframe+empty_moov",
-                    "-f",
-                    "mp4",
-                    "pipe:1",
+                    *_FFMPEG_PREVIEW_OUTPUT,
                 ]
 
                 process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
                 response = web.StreamResponse(status=200, headers={"Content-Type": "video/mp4"})
                 await response.prepare(request)
+                encoded = bytearray() if cache_key is not None else None
+                completed = False
                 try:
                     while True:
                         chunk = process.stdout.read(64 * 1024)
                         if not chunk:
+                            completed = True
                             break
+                        if encoded is not None:
+                            encoded += chunk
+                            if len(encoded) > _PREVIEW_CACHE_MAX_BYTES:
+                                encoded = None
                         try:
                             await response.write(chunk)
                         except (ClientConnectionResetError, ConnectionResetError, BrokenPipeError):
@@ -1808,6 +2133,8 @@ def _register_routes():
                         concat_path.unlink(missing_ok=True)
                     except Exception:
                         pass
+                if completed and encoded and process.returncode == 0:
+                    _preview_cache_put(cache_key, bytes(encoded))
                 try:
                     await response.write_eof()
                 except (ClientConnectionResetError, ConnectionResetError, BrokenPipeError):
@@ -1824,9 +2151,10 @@ def _register_routes():
             return web.FileResponse(path=first_frame)
 
         if resolved.mode == "video" and transcode and _ffmpeg_available():
-            if not _is_safe_path(path, context):
+            is_safe, exists = _check_existing_path(path, context, resolved.is_trusted)
+            if not is_safe:
                 raise web.HTTPForbidden()
-            if not path.exists():
+            if not exists:
                 raise web.HTTPNotFound()
             vf_parts = []
             if skip_first > 0 or every_nth > 1:
@@ -1838,28 +2166,13 @@ def _register_routes():
             if resize_to:
                 vf_parts.append(_ffmpeg_resize_filter(resize_to, resize_mode))
             cmd = [
-                "ffmpeg",
-                "-hide_banner",
-                "-loglevel",
-                "error",
+                *_FFMPEG_PREVIEW_PREFIX,
                 "-i",
                 str(path),
                 "-an",
                 *(["-vf", ",".join(vf_parts)] if vf_parts else []),
                 *(["-frames:v", str(max_frames)] if max_frames > 0 else []),
-                "-c:v",
-                "libx264",
-                "-preset",
-                "veryfast",
-                "-crf",
-                "26",
-                "-pix_fmt",
-                "yuv420p",
-                "-movflags",
-                "frag_keyframe+empty_moov",
-                "-f",
-                "mp4",
-                "pipe:1",
+                *_FFMPEG_PREVIEW_OUTPUT,
             ]
 
             process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
@@ -1887,9 +2200,10 @@ def _register_routes():
                 pass
             return response
 
-        if not _is_safe_path(path, context):
+        is_safe, exists = _check_existing_path(path, context, resolved.is_trusted)
+        if not is_safe:
             raise web.HTTPForbidden()
-        if not path.exists():
+        if not exists:
             raise web.HTTPNotFound()
         if resize_to and Image is not None and resolved.mode == "image":
             image = _open_image(path)
@@ -1924,31 +2238,39 @@ def _register_routes():
         except Exception as exc:
             raise web.HTTPBadRequest(text=f"Unable to create target dir: {exc}") from exc
 
+        loop = asyncio.get_running_loop()
         reader = await request.multipart()
         saved = []
         async for part in reader:
             if part.name != "file":
                 continue
-            filename = Path(part.filename or "upload.bin").name
+            filename = os.path.basename(part.filename or "upload.bin")
+            if filename in {"", ".", ".."}:
+                filename = "upload.bin"
             dest = target_dir / filename
             dest = _dedupe_path(dest)
             with dest.open("wb") as handle:
+                pending = bytearray()
                 while True:
                     chunk = await part.read_chunk()
                     if not chunk:
                         break
-                    handle.write(chunk)
+                    pending += chunk
+                    if len(pending) >= _UPLOAD_FLUSH_BYTES:
+                        data, pending = pending, bytearray()
+                        await loop.run_in_executor(None, handle.write, data)
+                if pending:
+                    await loop.run_in_executor(None, handle.write, pending)
             saved.append(str(dest))
 
-        return web.json_response({"saved": saved, "target_dir": str(target_dir)})
+        return _json_response({"saved": saved, "target_dir": str(target_dir)})
 
-    app = PromptServer.instance.app
-    app.add_routes(routes)
-    api_routes = web.RouteTableDef()
+    route_defs = []
     for route in routes:
         if isinstance(route, web.RouteDef):
-            api_routes.route(route.method, "/api" + route.path)(route.handler, **route.kwargs)
-    app.add_routes(api_routes)
+            route_defs.append(route)
+            route_defs.append(web.route(route.method, "/api" + route.path, route.handler, **route.kwargs))
+    PromptServer.instance.app.add_routes(route_defs)
     _ROUTES_REGISTERED = True
 
 
@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+import asyncio
+import atexit
+import hashlib
 import json
+import logging
 import os
+import re
+import secrets
 import time
-import uuid
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 
 try:
@@ -23,14 +30,35 @@ try:
 except Exception:  # pragma: no cover
     folder_paths = None
 
+try:
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None
+
 
+_LOGGER = logging.getLogger("comfyui-nlnodes")
+_OK_BODY = b'{"ok": true}'
 _ROUTES_REGISTERED = False
 _DEFAULTS_FILENAME = "nl_workflow.json"
 _DEFAULTS_SUBDIR = "defaults"
 _HISTORY_FILENAME = "nl_workflow_history.json"
 _HISTORY_LIMIT = 12
-_WORKFLOW_CONTEXT_CACHE: dict[str, dict] = {}
-_LAST_WORKFLOW_ID: str | None = None
+_HISTORY_FLUSH_DELAY = 0.5
+_PENDING_HISTORY: list[dict] | None = None
+_HISTORY_FLUSH_HANDLE: asyncio.TimerHandle | None = None
+_DEFAULTS_DIR: str | None = None
+_DEFAULTS_FILE: str | None = None
+_HISTORY_FILE: str | None = None
+_WRITTEN_JSON_STATE: dict[str, tuple[bytes, int, int]] = {}
+_READ_JSON_CACHE: dict[str, tuple[tuple[int, int], object]] = {}
+_DEFAULTS_RESPONSE: _DefaultsResponse | None = None
+_CONTEXT_CACHE_LIMIT = 64
+_WORKFLOW_CONTEXT_CACHE: OrderedDict[str, dict] = OrderedDict()
+_LAST_WORKFLOW_CONTEXT: dict | None = None
+_JSON_ENCODER = json.JSONEncoder(indent=2, sort_keys=True)
+_ORJSON_DUMP_OPTIONS = (
+    orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+)
 
 
 @dataclass(frozen=True)
@@ -41,9 +69,14 @@ class _EnvDefaults:
     shot: str | None = None
 
 
+@dataclass(frozen=True)
+class _DefaultsResponse:
+    signature: tuple[int, int]
+    body: bytes
+
+
 class NLWorkflow:
-    def __init__(self):
-        _register_routes()
+    __slots__ = ()
 
     @classmethod
     def INPUT_TYPES(cls):
@@ -129,10 +162,11 @@ class NLWorkflow:
         if fps <= 0:
             warnings.append("FPS should be positive.")
 
+        now = time.time()
         context = {
-            "workflow_id": str(uuid.uuid4()),
-            "generated_at": datetime.now(timezone.utc).isoformat(),
-            "generated_at_epoch": time.time(),
+            "workflow_id": secrets.token_hex(16),
+            "generated_at": datetime.fromtimestamp(now, timezone.utc).isoformat(),
+            "generated_at_epoch": now,
             "project": project or None,
             "episode": episode or None,
             "scene": scene or None,
@@ -156,6 +190,8 @@ class NLWorkflow:
 
 
 class NLContextDebug:
+    __slots__ = ()
+
     @classmethod
     def INPUT_TYPES(cls):
         return {
@@ -180,10 +216,7 @@ class NLContextDebug:
     ):
         lookup_id = workflow_id.strip() if workflow_id else None
         context = get_workflow_context(lookup_id if lookup_id or not use_last else None)
-        if context is None:
-            payload = {"error": "No workflow context found."}
-        else:
-            payload = dict(context)
+        payload = context if context is not None else {"error": "No workflow context found."}
         try:
             serialized = json.dumps(payload, indent=2, sort_keys=True)
         except Exception:
@@ -208,7 +241,7 @@ class NLWorkflowResolution:
         context = get_workflow_context()
         if not isinstance(context, dict):
             return "no-context"
-        return f"{context.get('workflow_id')}:{context.get('generated_at_epoch')}"
+        return context.get("workflow_id")
 
     def get_resolution(self):
         context = get_workflow_context()
@@ -237,7 +270,7 @@ class NLWorkflowFPS:
         context = get_workflow_context()
         if not isinstance(context, dict):
             return "no-context"
-        return f"{context.get('workflow_id')}:{context.get('generated_at_epoch')}"
+        return context.get("workflow_id")
 
     def get_fps(self):
         context = get_workflow_context()
@@ -265,7 +298,7 @@ class NLWorkflowProjectPath:
         context = get_workflow_context()
         if not isinstance(context, dict):
             return "no-context"
-        return f"{context.get('workflow_id')}:{context.get('generated_at_epoch')}"
+        return context.get("workflow_id")
 
     def get_project_path(self):
         context = get_workflow_context()
@@ -276,13 +309,10 @@ class NLWorkflowProjectPath:
 
 
 def _coalesce_text(value: str | None, fallback: str | None) -> str:
-    if value and value.strip():
-        return value.strip()
-    if fallback and fallback.strip():
-        return fallback.strip()
-    return ""
+    return (value or "").strip() or (fallback or "").strip()
 
 
+@lru_cache(maxsize=1)
 def _env_defaults() -> _EnvDefaults:
     return _EnvDefaults(
         project=os.environ.get("SHOW") or os.environ.get("PROJECT"),
@@ -292,101 +322,152 @@ def _env_defaults() -> _EnvDefaults:
     )
 
 
+_INVALID_IDENTIFIER_RE = re.compile(r"[^\w.-]")
+
+
 def _sanitize_identifier(value: str) -> str:
-    if not value:
+    if not value or _INVALID_IDENTIFIER_RE.search(value) is None:
         return value
-    safe = []
-    for char in value:
-        if char.isalnum() or char in ("_", "-", "."):
-            safe.append(char)
-        else:
-            safe.append("_")
-    return "".join(safe)
+    return _INVALID_IDENTIFIER_RE.sub("_", value)
 
 
 _INVALID_PATH_CHARS = set('<>:"|?*')
+_INVALID_PATH_TRANSLATION = str.maketrans({char: "_" for char in _INVALID_PATH_CHARS})
+_UNCLEAN_PATH_RE = re.compile(r'[<>:"|?*]|//')
+_PATHS_HAVE_DRIVES = os.name == "nt"
 
 
 def _sanitize_path(path_value: str) -> str:
     if not path_value:
         return path_value
     normalized = path_value.replace("\\", "/")
-    drive, rest = os.path.splitdrive(normalized)
+    if _PATHS_HAVE_DRIVES:
+        drive, rest = os.path.splitdrive(normalized)
+    else:
+        drive, rest = "", normalized
+    if _UNCLEAN_PATH_RE.search(rest) is None and (rest == "/" or not rest.endswith("/")):
+        return normalized
     prefix = ""
     if rest.startswith("/"):
         prefix = "/"
     parts = [part for part in rest.split("/") if part]
-    sanitized_parts = []
-    for part in parts:
-        sanitized = []
-        for char in part:
-            if char in _INVALID_PATH_CHARS:
-                sanitized.append("_")
-            else:
-                sanitized.append(char)
-        sanitized_parts.append("".join(sanitized))
-    sanitized_path = "/".join(sanitized_parts)
+    sanitized_path = "/".join(parts).translate(_INVALID_PATH_TRANSLATION)
     return f"{drive}{prefix}{sanitized_path}"
 
 
-def _defaults_path() -> Path:
-    if folder_paths is not None:
-        base = Path(folder_paths.get_user_directory())
-    else:
-        base = Path(os.getcwd()) / "user"
-    path = base / _DEFAULTS_SUBDIR
-    path.mkdir(parents=True, exist_ok=True)
-    return path / _DEFAULTS_FILENAME
+def _defaults_dir() -> str:
+    global _DEFAULTS_DIR
+    if _DEFAULTS_DIR is None:
+        if folder_paths is not None:
+            base = folder_paths.get_user_directory()
+        else:
+            base = os.path.join(os.getcwd(), "user")
+        path = str(Path(base) / _DEFAULTS_SUBDIR)
+        os.makedirs(path, exist_ok=True)
+        _DEFAULTS_DIR = path
+    return _DEFAULTS_DIR
 
 
-def _history_path() -> Path:
-    if folder_paths is not None:
-        base = Path(folder_paths.get_user_directory())
-    else:
-        base = Path(os.getcwd()) / "user"
-    path = base / _DEFAULTS_SUBDIR
-    path.mkdir(parents=True, exist_ok=True)
-    return path / _HISTORY_FILENAME
+def _defaults_path() -> str:
+    global _DEFAULTS_FILE
+    if _DEFAULTS_FILE is None:
+        _DEFAULTS_FILE = os.path.join(_defaults_dir(), _DEFAULTS_FILENAME)
+    return _DEFAULTS_FILE
+
+
+def _history_path() -> str:
+    global _HISTORY_FILE
+    if _HISTORY_FILE is None:
+        _HISTORY_FILE = os.path.join(_defaults_dir(), _HISTORY_FILENAME)
+    return _HISTORY_FILE
 
 
 def _read_history() -> dict:
     path = _history_path()
-    if not path.exists():
-        return {"ok": True, "data": [], "path": str(path)}
+    if _PENDING_HISTORY is not None:
+        return {"ok": True, "data": _PENDING_HISTORY, "path": path}
     try:
-        with path.open("r", encoding="utf-8") as handle:
-            data = json.load(handle)
+        data = _load_json_file(path)
     except Exception as exc:  # pragma: no cover - IO guard
-        return {"ok": False, "error": str(exc), "path": str(path)}
+        return {"ok": False, "error": str(exc), "path": path}
     if not isinstance(data, list):
         data = []
-    return {"ok": True, "data": data, "path": str(path)}
+    return {"ok": True, "data": data, "path": path}
 
 
 def _write_history(items: list[dict]) -> dict:
+    global _PENDING_HISTORY, _HISTORY_FLUSH_HANDLE
+    _PENDING_HISTORY = None
+    if _HISTORY_FLUSH_HANDLE is not None:
+        _HISTORY_FLUSH_HANDLE.cancel()
+        _HISTORY_FLUSH_HANDLE = None
     path = _history_path()
     try:
-        with path.open("w", encoding="utf-8") as handle:
-            json.dump(items, handle, indent=2, sort_keys=True)
+        written = _write_json_file(path, items)
     except Exception as exc:  # pragma: no cover - IO guard
-        return {"ok": False, "error": str(exc), "path": str(path)}
-    return {"ok": True, "path": str(path)}
+        return {"ok": False, "error": str(exc), "path": path}
+    if not written:
+        return {"ok": True, "unchanged": True, "path": path}
+    return {"ok": True, "path": path}
 
 
-def _history_entry_from_context(context: dict) -> dict:
-    return {
-        "id": str(uuid.uuid4()),
-        "saved_at": datetime.now(timezone.utc).isoformat(),
-        "saved_at_epoch": time.time(),
-        "project": context.get("project"),
-        "episode": context.get("episode"),
-        "scene": context.get("scene"),
-        "shot": context.get("shot"),
-        "resolution": context.get("resolution"),
-        "fps": context.get("fps"),
-        "project_path": context.get("project_path"),
-        "note": context.get("note"),
-    }
+def _load_json_file(path: str):
+    try:
+        stat = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        _READ_JSON_CACHE.pop(path, None)
+        return None
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _READ_JSON_CACHE.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    with open(path, "rb") as handle:
+        data = _json_loads(handle.read())
+    _READ_JSON_CACHE[path] = (signature, data)
+    return data
+
+
+def _write_json_file(path: str, payload) -> bool:
+    encoded = _json_dumps(payload)
+    digest = hashlib.blake2b(encoded, digest_size=16).digest()
+    cached = _WRITTEN_JSON_STATE.get(path)
+    if cached is not None and cached[0] == digest:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            stat = None
+        if stat is not None and (stat.st_mtime_ns, stat.st_size) == cached[1:]:
+            return False
+    _READ_JSON_CACHE.pop(path, None)
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as handle:
+            handle.write(encoded)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    stat = os.stat(path)
+    _WRITTEN_JSON_STATE[path] = (digest, stat.st_mtime_ns, stat.st_size)
+    return True
+
+
+def _json_dumps(payload) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload, option=_ORJSON_DUMP_OPTIONS)
+        except TypeError:
+            pass
+    return _JSON_ENCODER.encode(payload).encode("utf-8")
+
+
+def _json_loads(data: bytes):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
 
 def _history_signature(entry: dict) -> tuple:
@@ -404,22 +485,52 @@ def _history_signature(entry: dict) -> tuple:
 def _append_history_from_context(context: dict) -> None:
     if not isinstance(context, dict):
         return
-    entry = _history_entry_from_context(context)
+    now = time.time()
+    entry = {
+        "id": secrets.token_hex(16),
+        "saved_at": datetime.fromtimestamp(now, timezone.utc).isoformat(),
+        "saved_at_epoch": now,
+        "project": context["project"],
+        "episode": context["episode"],
+        "scene": context["scene"],
+        "shot": context["shot"],
+        "resolution": context["resolution"],
+        "fps": context["fps"],
+        "project_path": context["project_path"],
+        "note": context["note"],
+    }
     snapshot = _read_history()
     items = snapshot.get("data") if snapshot.get("ok") else []
     if not isinstance(items, list):
         items = []
     signature = _history_signature(entry)
-    deduped = []
-    for item in items:
-        if not isinstance(item, dict):
-            continue
-        if _history_signature(item) == signature:
-            continue
-        deduped.append(item)
-    deduped.insert(0, entry)
-    deduped = deduped[:_HISTORY_LIMIT]
-    _write_history(deduped)
+    deduped = [entry]
+    deduped.extend(
+        item for item in items if isinstance(item, dict) and _history_signature(item) != signature
+    )
+    del deduped[_HISTORY_LIMIT:]
+    _schedule_history_write(deduped)
+
+
+def _schedule_history_write(items: list[dict]) -> None:
+    global _PENDING_HISTORY, _HISTORY_FLUSH_HANDLE
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        _write_history(items)
+        return
+    _PENDING_HISTORY = items
+    if _HISTORY_FLUSH_HANDLE is not None:
+        _HISTORY_FLUSH_HANDLE.cancel()
+    _HISTORY_FLUSH_HANDLE = loop.call_later(_HISTORY_FLUSH_DELAY, _flush_history)
+
+
+def _flush_history() -> None:
+    if _PENDING_HISTORY is not None:
+        _write_history(_PENDING_HISTORY)
+
+
+atexit.register(_flush_history)
 
 
 def _delete_history_entry(entry_id: str) -> dict:
@@ -438,74 +549,101 @@ def _clear_history() -> dict:
 
 
 def _write_defaults(payload: dict) -> dict:
+    global _DEFAULTS_RESPONSE
     path = _defaults_path()
     try:
-        with path.open("w", encoding="utf-8") as handle:
-            json.dump(payload, handle, indent=2, sort_keys=True)
+        written = _write_json_file(path, payload)
     except Exception as exc:  # pragma: no cover - IO guard
+        _DEFAULTS_RESPONSE = None
         return {"ok": False, "error": str(exc)}
-    return {"ok": True, "path": str(path)}
+    if not written:
+        return {"ok": True, "unchanged": True, "path": path}
+    _DEFAULTS_RESPONSE = None
+    return {"ok": True, "path": path}
 
 
 def _read_defaults() -> dict:
     path = _defaults_path()
-    if not path.exists():
-        return {"ok": True, "data": {}, "path": str(path)}
     try:
-        with path.open("r", encoding="utf-8") as handle:
-            data = json.load(handle)
+        data = _load_json_file(path)
     except Exception as exc:  # pragma: no cover - IO guard
-        return {"ok": False, "error": str(exc), "path": str(path)}
-    return {"ok": True, "data": data or {}, "path": str(path)}
+        return {"ok": False, "error": str(exc), "path": path}
+    return {"ok": True, "data": data or {}, "path": path}
+
+
+def _defaults_response_body() -> bytes:
+    global _DEFAULTS_RESPONSE
+    path = _defaults_path()
+    try:
+        stat = os.stat(path)
+    except OSError:
+        signature = None
+    else:
+        signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _DEFAULTS_RESPONSE
+    if cached is not None and signature is not None and cached.signature == signature:
+        return cached.body
+    result = _read_defaults()
+    body = json.dumps(result).encode("utf-8")
+    if signature is not None and result.get("ok"):
+        _DEFAULTS_RESPONSE = _DefaultsResponse(signature=signature, body=body)
+    return body
 
 
 def _clear_cache() -> None:
-    global _WORKFLOW_CONTEXT_CACHE, _LAST_WORKFLOW_ID
-    _WORKFLOW_CONTEXT_CACHE = {}
-    _LAST_WORKFLOW_ID = None
+    global _WORKFLOW_CONTEXT_CACHE, _LAST_WORKFLOW_CONTEXT
+    _WORKFLOW_CONTEXT_CACHE = OrderedDict()
+    _LAST_WORKFLOW_CONTEXT = None
 
 
 def _reset_defaults() -> dict:
+    global _DEFAULTS_RESPONSE
     path = _defaults_path()
+    _DEFAULTS_RESPONSE = None
     try:
-        if path.exists():
-            path.unlink()
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
     except Exception as exc:  # pragma: no cover - IO guard
-        return {"ok": False, "error": str(exc), "path": str(path)}
-    return {"ok": True, "path": str(path)}
+        return {"ok": False, "error": str(exc), "path": path}
+    return {"ok": True, "path": path}
 
 
 def _emit_warnings(warnings: list[str]) -> None:
     if not warnings:
         return
     for warning in warnings:
-        print(f"[comfyui-nlnodes] NL Workflow warning: {warning}")
+        _LOGGER.warning("[comfyui-nlnodes] NL Workflow warning: %s", warning)
 
 
 def _cache_context(context: dict) -> None:
-    global _LAST_WORKFLOW_ID
+    global _LAST_WORKFLOW_CONTEXT
     workflow_id = context.get("workflow_id")
     if not isinstance(workflow_id, str) or not workflow_id:
         return
-    _WORKFLOW_CONTEXT_CACHE[workflow_id] = dict(context)
-    _LAST_WORKFLOW_ID = workflow_id
+    _WORKFLOW_CONTEXT_CACHE[workflow_id] = context
+    _WORKFLOW_CONTEXT_CACHE.move_to_end(workflow_id)
+    while len(_WORKFLOW_CONTEXT_CACHE) > _CONTEXT_CACHE_LIMIT:
+        _WORKFLOW_CONTEXT_CACHE.popitem(last=False)
+    _LAST_WORKFLOW_CONTEXT = context
 
 
 def get_workflow_context(workflow_id: str | None = None) -> dict | None:
     if workflow_id:
-        return _WORKFLOW_CONTEXT_CACHE.get(workflow_id)
-    if _LAST_WORKFLOW_ID:
-        return _WORKFLOW_CONTEXT_CACHE.get(_LAST_WORKFLOW_ID)
-    return None
+        context = _WORKFLOW_CONTEXT_CACHE.get(workflow_id)
+        if context is not None:
+            _WORKFLOW_CONTEXT_CACHE.move_to_end(workflow_id)
+        return context
+    return _LAST_WORKFLOW_CONTEXT
 
 
 def _build_cache_context(payload: dict) -> dict:
     warnings = []
-    project = _coalesce_text(payload.get("project", ""), None)
-    episode = _coalesce_text(payload.get("episode", ""), None)
-    scene = _coalesce_text(payload.get("scene", ""), None)
-    shot = _coalesce_text(payload.get("shot", ""), None)
-    project_path = _sanitize_path(_coalesce_text(payload.get("project_path", ""), None))
+    project = (payload.get("project") or "").strip()
+    episode = (payload.get("episode") or "").strip()
+    scene = (payload.get("scene") or "").strip()
+    shot = (payload.get("shot") or "").strip()
+    project_path = _sanitize_path((payload.get("project_path") or "").strip())
 
     if not project_path:
         warnings.append("Project path is empty.")
@@ -518,10 +656,11 @@ def _build_cache_context(payload: dict) -> dict:
     if fps <= 0:
         warnings.append("FPS should be positive.")
 
+    now = time.time()
     return {
-        "workflow_id": str(uuid.uuid4()),
-        "generated_at": datetime.now(timezone.utc).isoformat(),
-        "generated_at_epoch": time.time(),
+        "workflow_id": secrets.token_hex(16),
+        "generated_at": datetime.fromtimestamp(now, timezone.utc).isoformat(),
+        "generated_at_epoch": now,
         "project": project or None,
         "episode": episode or None,
         "scene": scene or None,
@@ -535,6 +674,8 @@ def _build_cache_context(payload: dict) -> dict:
 
 
 def _safe_int(value, default: int) -> int:
+    if type(value) is int:
+        return value
     try:
         return int(value)
     except Exception:
@@ -542,6 +683,8 @@ def _safe_int(value, default: int) -> int:
 
 
 def _safe_float(value, default: float) -> float:
+    if type(value) is float:
+        return value
     try:
         return float(value)
     except Exception:
@@ -559,13 +702,22 @@ def populate_cache_from_payload(payload: dict) -> dict:
     return {"ok": True, "context": context}
 
 
+async def _read_request_json(request):
+    body = await request.read()
+    return _json_loads(body)
+
+
+def _ok_response():
+    return web.Response(body=_OK_BODY, content_type="application/json")
+
+
 async def _handle_get_defaults(request):
-    return web.json_response(_read_defaults())
+    return web.Response(body=_defaults_response_body(), content_type="application/json")
 
 
 async def _handle_set_defaults(request):
     try:
-        payload = await request.json()
+        payload = await _read_request_json(request)
     except Exception:
         payload = {}
     return web.json_response(_write_defaults(payload))
@@ -578,7 +730,7 @@ async def _handle_reset_defaults(request):
 
 async def _handle_clear_cache(request):
     _clear_cache()
-    return web.json_response({"ok": True})
+    return _ok_response()
 
 
 async def _handle_get_history(request):
@@ -587,7 +739,7 @@ async def _handle_get_history(request):
 
 async def _handle_delete_history(request):
     try:
-        payload = await request.json()
+        payload = await _read_request_json(request)
     except Exception:
         payload = {}
     entry_id = str(payload.get("id") or "")
@@ -606,7 +758,7 @@ async def _handle_clear_history(request):
 
 async def _handle_commit_history(request):
     try:
-        payload = await request.json()
+        payload = await _read_request_json(request)
     except Exception:
         payload = {}
     if not isinstance(payload, dict):
@@ -615,7 +767,29 @@ async def _handle_commit_history(request):
     if not context.get("project_path"):
         return web.json_response({"ok": False, "error": "Project path is empty."}, status=400)
     _append_history_from_context(context)
-    return web.json_response({"ok": True})
+    return _ok_response()
+
+
+async def _handle_populate_cache(request):
+    try:
+        payload = await _read_request_json(request)
+    except Exception:
+        payload = {}
+    return web.json_response(populate_cache_from_payload(payload))
+
+
+_ROUTE_TABLE = (
+    ("GET", "/nl_workflow/defaults", _handle_get_defaults),
+    ("POST", "/nl_workflow/defaults", _handle_set_defaults),
+    ("GET", "/nl_workflow/history", _handle_get_history),
+    ("POST", "/nl_workflow/history/delete", _handle_delete_history),
+    ("POST", "/nl_workflow/history/clear", _handle_clear_history),
+    ("POST", "/nl_workflow/history/commit", _handle_commit_history),
+    ("POST", "/nl_workflow/reset", _handle_reset_defaults),
+    ("POST", "/nl_workflow/clear_cache", _handle_clear_cache),
+    ("POST", "/nl_workflow/populate_cache", _handle_populate_cache),
+)
+
 
 def _register_routes():
     global _ROUTES_REGISTERED
@@ -626,55 +800,13 @@ def _register_routes():
     if PromptServer.instance is None:
         return
 
-    routes = web.RouteTableDef()
-
-    @routes.get("/nl_workflow/defaults")
-    async def get_defaults(request):
-        return await _handle_get_defaults(request)
-
-    @routes.post("/nl_workflow/defaults")
-    async def set_defaults(request):
-        return await _handle_set_defaults(request)
-
-    @routes.get("/nl_workflow/history")
-    async def get_history(request):
-        return await _handle_get_history(request)
-
-    @routes.post("/nl_workflow/history/delete")
-    async def delete_history(request):
-        return await _handle_delete_history(request)
-
-    @routes.post("/nl_workflow/history/clear")
-    async def clear_history(request):
-        return await _handle_clear_history(request)
-
-    @routes.post("/nl_workflow/history/commit")
-    async def commit_history(request):
-        return await _handle_commit_history(request)
-
-    @routes.post("/nl_workflow/reset")
-    async def reset_defaults(request):
-        return await _handle_reset_defaults(request)
-
-    @routes.post("/nl_workflow/clear_cache")
-    async def clear_cache(request):
-        return await _handle_clear_cache(request)
-
-    @routes.post("/nl_workflow/populate_cache")
-    async def populate_cache(request):
-        try:
-            payload = await request.json()
-        except Exception:
-            payload = {}
-        return web.json_response(populate_cache_from_payload(payload))
-
-    app = PromptServer.instance.app
-    app.add_routes(routes)
-    api_routes = web.RouteTableDef()
-    for route in routes:
-        if isinstance(route, web.RouteDef):
-            api_routes.route(route.method, "/api" + route.path)(route.handler, **route.kwargs)
-    app.add_routes(api_routes)
+    router = PromptServer.instance.app.router
+    for method, path, handler in _ROUTE_TABLE:
+        for route_path in (path, "/api" + path):
+            if method == "GET":
+                router.add_get(route_path, handler)
+            else:
+                router.add_route(method, route_path, handler)
     _ROUTES_REGISTERED = True
 
 